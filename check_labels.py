@@ -5,7 +5,7 @@ path = r"C:\Users\ANURAG\Dropbox\MediBELL_DATABASE\Data\processed\label_mapping_
 print("Reading:", path)
 
 try:
-    df = pd.read_csv(path)
+    df = pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
     print("\nColumns:", df.columns.tolist())
     print("\nRows:")
     print(df)
@@ -7,130 +7,99 @@ Usage:
 
 This script converts an XGBoost JSON booster (gbtree) into an inlined JS implementation that:
 - exposes `export function predict(f)` (f = feature array)
-- each tree is a function tree_N(f) returning a scalar
-- predict sums trees per target class using tree_info (XGBoost interleaves trees for multiclass)
-- uses softmax to return probabilities
+- all trees are concatenated into five global typed arrays (feat, thr, left, right, leaf);
+  offsets[t] is the root node of tree t and child indices are relative to it
+- trees are flattened and formatted in parallel across a process pool
+- predict walks every tree in one tight loop and sums leaves per target class using
+  treeInfo (XGBoost interleaves trees for multiclass), starting from the per-class
+  learner_model_param.base_score
+- uses softmax to return probabilities; `export function predictClass(f)` returns the
+  argmax of the summed leaves instead, skipping the softmax
 
 Notes:
 - The script expects the booster JSON to contain:
   data['learner']['gradient_booster']['model']['trees']  (list of tree dicts)
   and data['learner']['learner_model_param']['num_class'] (num_class)
+  and data['learner']['learner_model_param']['base_score'] (scalar or one value per class)
   and possibly data['learner']['gradient_booster']['model']['tree_info']
 - It uses node arrays inside each tree:
-  left_children, right_children, split_indices, split_conditions, base_weights.
-- If JSON structure differs slightly, the script attempts a few common alternative paths.
+  left_children, right_children, split_indices, split_conditions; like XGBoost,
+  a node sends f to its left child when f[feat] < thr.
+- The booster JSON is parsed with orjson and the trees are cached in a
+  <booster>.json.trees.pkl sidecar, reused while the JSON's mtime and size match.
 """
 
-import json
 import sys
 import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
 
-def find_booster_trees(data):
-    # common paths
-    try:
-        return data['learner']['gradient_booster']['model']['trees']
-    except Exception:
-        pass
-    try:
-        return data['learner']['gradient_booster']['model']['gbtree']['trees']
-    except Exception:
-        pass
-    # fallback: search for dict that looks like a tree list
-    def find_trees(obj):
-        if isinstance(obj, dict):
-            for k, v in obj.items():
-                if k == 'trees' and isinstance(v, list):
-                    return v
-                elif isinstance(v, (dict, list)):
-                    res = find_trees(v)
-                    if res:
-                        return res
-        elif isinstance(obj, list):
-            for item in obj:
-                res = find_trees(item)
-                if res:
-                    return res
-        return None
-    return find_trees(data)
-
-def get_num_class(data):
+import orjson
+
+from scripts.booster_js import NODE_ARRAYS, WRITE_BUFFER, js_floats, js_ints, parse_base_score, write_model_js
+
+# Parsed trees are pickled next to the booster JSON, keyed by its mtime and size
+CACHE_SUFFIX = '.trees.pkl'
+
+def load_booster(path):
+    """
+    Return (trees, tree_info, num_class, base_score) from the booster JSON.
+    Parses with orjson and caches the result in a pickle sidecar, so re-running
+    on an unchanged booster skips the JSON parse entirely.
+    """
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cache_path = path + CACHE_SUFFIX
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            cached = pickle.load(f)
+        # sidecars written before base_score was cached are re-parsed
+        if cached.get('key') == key and 'base_score' in cached:
+            return cached['trees'], cached['tree_info'], cached['num_class'], cached['base_score']
+
+    with open(path, 'rb') as f:
+        data = orjson.loads(f.read())
+    # XGBoost always saves the trees here; anything else is not a booster JSON
     try:
-        return int(data['learner']['learner_model_param'].get('num_class', 1))
-    except Exception:
-        # fallback: try objective
-        try:
-            return int(data['learner']['objective']['softmax_multiclass_param']['num_class'])
-        except Exception:
-            return 1
-
-def emit_tree_js(tree, tree_idx):
+        model = data['learner']['gradient_booster']['model']
+        trees = model['trees']
+    except KeyError:
+        print("ERROR: no learner.gradient_booster.model.trees in", path)
+        sys.exit(1)
+    tree_info = model.get('tree_info', [])
+    model_param = data['learner']['learner_model_param']
+    num_class = int(model_param.get('num_class', 1))
+    base_score = parse_base_score(model_param.get('base_score', '0'), max(num_class, 1))
+
+    with open(cache_path, 'wb') as f:
+        pickle.dump({'key': key, 'trees': trees, 'tree_info': tree_info, 'num_class': num_class,
+                     'base_score': base_score}, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return trees, tree_info, num_class, base_score
+
+def flatten_tree(tree):
     """
-    tree: dict with keys: left_children, right_children, split_indices, split_conditions, base_weights
-    We'll create nested ifs. We'll assume left_children[i] == -1 indicates leaf.
-    For leaf node, we'll find the corresponding leaf weight in base_weights:
-      - If base_weights length == num_nodes: assume weight per node index
-      - Else if base_weights length == 1: use base_weights[0]
-      - Else if base_weights length > 1 and equals num_class: choose appropriate handling (return base_weights[0])
+    tree: dict with keys: left_children, right_children, split_indices, split_conditions
+    Returns (feat, thr, left, right, leaf) lists indexed by node; left_children[i] == -1 marks a leaf.
+    XGBoost stores a leaf's value in split_conditions (base_weights is the pre-learning-rate
+    weight), so leaves take leaf = split_conditions[i] and split nodes take thr = split_conditions[i].
     """
-    left = tree.get('left_children') or tree.get('left_children', [])
-    right = tree.get('right_children') or tree.get('right_children', [])
-    split_idx = tree.get('split_indices') or tree.get('split_indices', [])
-    split_cond = tree.get('split_conditions') or tree.get('split_conditions', [])
-    base_weights = tree.get('base_weights') or tree.get('base_weights', [])
-    default_left = tree.get('default_left') or tree.get('default_left', [])
-    # Some JSONs store children as ints; ensure lists of ints
+    left = tree['left_children']
+    right = tree['right_children']
+    split_idx = tree['split_indices']
+    split_cond = tree['split_conditions']
     n_nodes = len(left)
-    # Determine mapping of node index -> leaf weight
-    # If base_weights length equals n_nodes, map directly node -> base_weights[node]
-    leaf_weights_map = {}
-    if isinstance(base_weights, list) and len(base_weights) == n_nodes:
-        for i in range(n_nodes):
-            leaf_weights_map[i] = base_weights[i]
-    else:
-        # Many boosters store base_weights as leaf values only for leaves.
-        # We'll attempt to detect leaves and assign sequential leaf weights if base_weights length equals number of leaves.
-        leaves = [i for i in range(n_nodes) if (left[i] < 0 and right[i] < 0)]
-        if isinstance(base_weights, list) and len(base_weights) == len(leaves):
-            for idx, node in enumerate(leaves):
-                leaf_weights_map[node] = base_weights[idx]
-        else:
-            # fallback: if base_weights is scalar or list of one, use base_weights[0] for all leaves
-            val = base_weights[0] if isinstance(base_weights, list) and len(base_weights) > 0 else (base_weights if isinstance(base_weights, (int,float)) else 0.0)
-            for i in range(n_nodes):
-                if left[i] < 0 and right[i] < 0:
-                    leaf_weights_map[i] = val
-
-    # Now recursively emit code
-    sys.setrecursionlimit(10000)
-    lines = []
-    def emit_node(i, indent):
-        sp = "  " * indent
-        if left[i] < 0 and right[i] < 0:
-            # leaf
-            val = leaf_weights_map.get(i, 0.0)
-            # ensure number literal JS-friendly
-            if isinstance(val, float) or isinstance(val, int):
-                lines.append(f"{sp}return {repr(float(val))};")
-            else:
-                lines.append(f"{sp}return {repr(float(val))};")
-            return
-        # non-leaf
-        feat = split_idx[i] if i < len(split_idx) else 0
-        cond = split_cond[i] if i < len(split_cond) else 0
-        # handle NaN default: use default_left flag
-        dl = default_left[i] if i < len(default_left) else 0
-        # create condition: if (f[feat] <= cond) { left } else { right }
-        # But if cond is very small/float, keep repr
-        lines.append(f"{sp}if (f[{feat}] <= {repr(float(cond))}) {{")
-        emit_node(left[i], indent+1)
-        lines.append(f"{sp}}} else {{")
-        emit_node(right[i], indent+1)
-        lines.append(f"{sp}}}")
-    # start function
-    lines.append(f"function tree_{tree_idx}(f) {{")
-    emit_node(0, 1)
-    lines.append("}")
-    return "\n".join(lines)
+
+    is_leaf = [left[i] < 0 for i in range(n_nodes)]
+    feat = [0 if is_leaf[i] else split_idx[i] for i in range(n_nodes)]
+    thr = [0.0 if is_leaf[i] else split_cond[i] for i in range(n_nodes)]
+    leaf = [split_cond[i] if is_leaf[i] else 0.0 for i in range(n_nodes)]
+
+    return feat, thr, list(left), list(right), leaf
+
+def emit_tree_rows(tree):
+    """Process-pool worker: flatten one tree and format its node arrays as JS rows."""
+    feat, thr, left, right, leaf = flatten_tree(tree)
+    return len(feat), (js_ints(feat), js_floats(thr), js_ints(left), js_ints(right), js_floats(leaf))
 
 def main():
     if len(sys.argv) < 3:
@@ -138,70 +107,41 @@ def main():
         sys.exit(1)
     infile = sys.argv[1]
     outfile = sys.argv[2]
-    with open(infile, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    trees = find_booster_trees(data)
-    if not trees:
-        print("ERROR: Could not locate trees in JSON. Please check JSON structure.")
-        sys.exit(1)
-
-    num_class = get_num_class(data)
-    tree_info = []
-    # sometimes tree_info sits next to trees
-    try:
-        tree_info = data['learner']['gradient_booster']['model'].get('tree_info', [])
-    except Exception:
-        tree_info = []
-
-    # If tree_info empty, populate with zeros (assume single class)
-    if not tree_info:
-        tree_info = [0]*len(trees)
-
-    print(f"Found {len(trees)} trees, num_class={num_class}, tree_info len={len(tree_info)}")
+    # tree_info sits next to trees: class id of each tree
+    trees, tree_info, num_class, base_score = load_booster(infile)
 
     # Create JS file
     header = """// AUTO-GENERATED from booster JSON by convert_booster_to_js.py
 // DO NOT EDIT MANUALLY
 """
-    with open(outfile, 'w', encoding='utf-8') as out:
+    with open(outfile, 'w', encoding='utf-8', buffering=WRITE_BUFFER) as out:
         out.write(header + "\n")
-        # write tree functions
-        for i, tree in enumerate(trees):
-            js_tree = emit_tree_js(tree, i)
-            out.write(js_tree + "\n\n")
-        # write trees array and predict
-        out.write("const trees = [\n")
-        out.write(",\n".join([f"  tree_{i}" for i in range(len(trees))]))
-        out.write("\n];\n\n")
-        out.write("""function softmax(arr) {
-  const m = Math.max(...arr);
-  const exps = arr.map(v => Math.exp(v - m));
-  const sum = exps.reduce((a,b) => a + b, 0);
-  return exps.map(v => v / sum);
-}
-
-export function predict(f) {
-  const numClasses = %d;
-  let logits = new Array(numClasses).fill(0);
-""" % (num_class))
-        # sum trees according to tree_info: each tree belongs to tree_info[i] class
-        # if tree_info mapping length matches trees length, use it; else assume interleaved by class
-        if len(tree_info) == len(trees):
-            # use explicit mapping
-            for i in range(len(trees)):
-                cls = int(tree_info[i])
-                out.write(f"  logits[{cls}] += tree_{i}(f);\n")
-        else:
-            # assume interleaved: tree i goes to class = i % numClasses
-            out.write("  for (let i=0;i<trees.length;i++){\n")
-            out.write("    const cls = i % numClasses;\n")
-            out.write("    logits[cls] += trees[i](f);\n")
-            out.write("  }\n")
-        out.write("""
-  return softmax(logits);
-}
-""")
+        # flatten and format trees in parallel; results come back in tree order
+        with ProcessPoolExecutor() as ex:
+            results = list(ex.map(emit_tree_rows, trees, chunksize=16))
+        # each tree's values form one row of every array
+        rows = {name: [] for name, _ in NODE_ARRAYS}
+        offsets = [0]
+        for n_nodes, tree_rows in results:
+            for (name, _), row in zip(NODE_ARRAYS, tree_rows):
+                rows[name].append(row)
+            offsets.append(offsets[-1] + n_nodes)
+        n_trees = len(offsets) - 1
+
+        if n_trees == 0:
+            print("ERROR: Could not locate trees in JSON. Please check JSON structure.")
+            sys.exit(1)
+
+        # If tree_info empty, populate with zeros (assume single class)
+        if not tree_info:
+            tree_info = [0]*n_trees
+        # if tree_info mapping length doesn't match trees length, assume interleaved by class
+        if len(tree_info) != n_trees:
+            tree_info = [i % num_class for i in range(n_trees)]
+
+        print(f"Found {n_trees} trees, num_class={num_class}, tree_info len={len(tree_info)}")
+
+        write_model_js(out, rows, offsets, tree_info, base_score)
     print("Wrote", outfile)
 
 if __name__ == "__main__":
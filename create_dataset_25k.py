@@ -1,12 +1,12 @@
 import pandas as pd
 import numpy as np
-from tqdm import tqdm
 
 # -----------------------------
 # CONFIG
 # -----------------------------
 
 NUM_ROWS = 25000
+SEED = 0  # fixed so regenerated datasets (and assign_disease) are reproducible
 
 diseases = [
     "influenza", "common_cold", "pneumonia", "asthma",
@@ -32,76 +32,65 @@ symptoms = [
 # Helper: Assign disease logically
 # -----------------------------
 
-def assign_disease(row):
-    # 🔵 Influenza
-    if row["fever"] >= 2 and row["cough"] >= 2 and row["body_ache"] >= 2:
-        return "influenza"
-
-    # 🟢 Common Cold
-    if row["runny_nose"] >= 2 and row["sore_throat"] >= 1:
-        return "common_cold"
-
-    # 🔴 Pneumonia
-    if (row["shortness_of_breath"] >= 2 or row["breathing_difficulty"] >= 2) and row["chest_pain"] >= 1:
-        return "pneumonia"
-
-    # 🟠 Asthma
-    if row["wheezing"] >= 2 or row["dry_cough"] >= 2:
-        return "asthma"
-
-    # 🟤 Bronchitis
-    if row["wet_cough"] >= 2 and row["chest_pain"] >= 2:
-        return "bronchitis"
-
-    # 🟡 COVID-19
-    if row["fever"] >= 2 and row["loss_of_smell"] >= 1:
-        return "covid19"
-
-    # 💚 Allergy
-    if row["rash"] >= 2 or row["itchiness"] >= 2 or row["eye_irritation"] >= 2:
-        return "allergy"
-
-    # ⚫ Tuberculosis
-    if row["cough"] >= 2 and row["fatigue"] >= 2:
-        return "tuberculosis"
-
-    return np.random.choice(diseases)
+def assign_disease(df, rng):
+    # Rules are checked in priority order; np.select takes the first match
+    conditions = [
+        # 🔵 Influenza
+        (df["fever"] >= 2) & (df["cough"] >= 2) & (df["body_ache"] >= 2),
+        # 🟢 Common Cold
+        (df["runny_nose"] >= 2) & (df["sore_throat"] >= 1),
+        # 🔴 Pneumonia
+        ((df["shortness_of_breath"] >= 2) | (df["breathing_difficulty"] >= 2)) & (df["chest_pain"] >= 1),
+        # 🟠 Asthma
+        (df["wheezing"] >= 2) | (df["dry_cough"] >= 2),
+        # 🟤 Bronchitis
+        (df["wet_cough"] >= 2) & (df["chest_pain"] >= 2),
+        # 🟡 COVID-19
+        (df["fever"] >= 2) & (df["loss_of_smell"] >= 1),
+        # 💚 Allergy
+        (df["rash"] >= 2) | (df["itchiness"] >= 2) | (df["eye_irritation"] >= 2),
+        # ⚫ Tuberculosis
+        (df["cough"] >= 2) & (df["fatigue"] >= 2),
+    ]
+
+    # One condition per entry in `diseases`, in the same order
+    return np.select(conditions, diseases, default=rng.choice(diseases, size=len(df)))
 
 # -----------------------------
 # Generate Data
 # -----------------------------
 
-rows = []
 print("Generating dataset...")
 
-for _ in tqdm(range(NUM_ROWS)):
-    person = {
-        "age": np.random.randint(5, 85),
-        "gender": np.random.choice(["male", "female"]),
-        "smoker": np.random.choice([0, 1]),
-        "diabetes": np.random.choice([0, 1]),
-        "heart_rate": np.random.randint(60, 140),
-        "blood_pressure": np.random.randint(90, 180),
-        "cholesterol_level": np.random.randint(120, 300),
-    }
+rng = np.random.default_rng(SEED)
 
-    # Add all symptoms (0–3 severity)
-    for s in symptoms:
-        person[s] = np.random.randint(0, 4)
+# Draw every column in one batched call instead of row by row; the column
+# arrays are handed to pandas as-is (copy=False).
+# Smallest dtype that fits: flags are int8, vitals (< 300) are int16
+demographics = pd.DataFrame({
+    "age": rng.integers(5, 85, NUM_ROWS, dtype=np.int16),
+    "gender": rng.choice(["male", "female"], NUM_ROWS),
+    "smoker": rng.integers(0, 2, NUM_ROWS, dtype=np.int8),
+    "diabetes": rng.integers(0, 2, NUM_ROWS, dtype=np.int8),
+    "heart_rate": rng.integers(60, 140, NUM_ROWS, dtype=np.int16),
+    "blood_pressure": rng.integers(90, 180, NUM_ROWS, dtype=np.int16),
+    "cholesterol_level": rng.integers(120, 300, NUM_ROWS, dtype=np.int16),
+}, copy=False)
 
-    # Assign disease outcome
-    person["disease"] = assign_disease(person)
+# All symptoms (0–3 severity)
+symptom_mat = rng.integers(0, 4, size=(NUM_ROWS, len(symptoms)), dtype=np.int8)
 
-    rows.append(person)
+df = pd.concat([demographics, pd.DataFrame(symptom_mat, columns=symptoms)], axis=1)
 
-df = pd.DataFrame(rows)
+# Assign disease outcome
+df["disease"] = assign_disease(df, rng)
 
 # -----------------------------
-# Save to CSV
+# Save to Parquet (typed, compressed, columnar)
 # -----------------------------
 
-output_path = "synthetic_dataset_25k_40symptoms.csv"
-df.to_csv(output_path, index=False)
+output_path = "synthetic_dataset_25k_40symptoms.parquet"
+df.to_parquet(output_path, index=False, compression="zstd")
 
 print("\n🎉 Dataset generated successfully!")
 print(f"📁 Saved to: {output_path}")
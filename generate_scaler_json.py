@@ -1,9 +1,17 @@
+import base64
 import json
+import sys
+import numpy as np
 import pandas as pd
-from sklearn.preprocessing import StandardScaler
 
 # Load the SAME dataset used for training the XGBoost model
-df = pd.read_csv("Data/processed/final_dataset_25k.csv")
+# (pass another Parquet or CSV path as the first argument to fit on a different dataset)
+data_path = sys.argv[1] if len(sys.argv) > 1 else "Data/processed/final_dataset_25k.parquet"
+if data_path.endswith(".parquet"):
+    df = pd.read_parquet(data_path)
+else:
+    # Arrow's multi-threaded CSV reader; NumPy-backed columns keep the float32 view below cheap
+    df = pd.read_csv(data_path, engine="pyarrow")
 
 # Remove disease columns
 drop_cols = ["disease", "label"]
@@ -13,13 +21,22 @@ print("Number of features:", len(feature_names))
 print("Features:", feature_names)
 
 # Fit scaler ONLY on the 46 symptom columns
-scaler = StandardScaler()
-scaler.fit(df[feature_names])
+# (plain NumPy reductions, same result as StandardScaler: ddof=0, std 0 -> 1)
+arr = df[feature_names].to_numpy(dtype=np.float32, copy=False)
+mean = arr.mean(axis=0)
+std = arr.std(axis=0)
+std[std == 0] = 1.0
+# Precompute 1/std so the JS side scales with a multiply instead of a divide
+inv_std = (1.0 / std).astype(np.float32)
+
+def f32_b64(arr):
+    """Little-endian Float32 bytes, base64-encoded; JS decodes into a Float32Array."""
+    return base64.b64encode(arr.astype("<f4").tobytes()).decode("ascii")
 
 scaler_json = {
     "feature_names": feature_names,
-    "mean": scaler.mean_.tolist(),
-    "std": scaler.scale_.tolist()
+    "mean_b64": f32_b64(mean),
+    "inv_std_b64": f32_b64(inv_std)
 }
 
 with open("scaler.json", "w") as f:
@@ -0,0 +1,110 @@
+"""
+booster_js.py
+
+Shared pieces of the flat typed-array JS emitters (convert_booster_to_js.py,
+convert_booster_v2.py, scripts/generate_inlined_js.py):
+- js_ints / js_floats format node arrays as JS array literals
+- parse_base_score reads the per-class base margin from learner_model_param
+- SOFTMAX_JS / PREDICT_JS: the fused softmax, and predict / predictClass on top of
+  the emitter's own treeLogits(f)
+- write_model_js writes the five node arrays, offsets, treeInfo and baseScore, followed
+  by treeLogits, softmax, predict and predictClass
+
+The root converters import it as scripts.booster_js.
+"""
+
+import json
+
+import numpy as np
+
+# Write buffer for the generated JS: the node arrays go out in a few large chunks
+WRITE_BUFFER = 1 << 20
+
+NODE_ARRAYS = [
+    ('feat', 'Int32Array'),
+    ('thr', 'Float32Array'),
+    ('left', 'Int32Array'),
+    ('right', 'Int32Array'),
+    ('leaf', 'Float32Array'),
+]
+
+SOFTMAX_JS = """
+function softmax(a) {
+  // max, exp+sum and normalize as three plain loops, in place
+  let m = a[0];
+  for (let i = 1; i < a.length; i++) if (a[i] > m) m = a[i];
+  let s = 0;
+  for (let i = 0; i < a.length; i++) {
+    a[i] = Math.exp(a[i] - m);
+    s += a[i];
+  }
+  for (let i = 0; i < a.length; i++) a[i] /= s;
+  return a;
+}
+"""
+
+# treeLogits for the layout write_model_js emits: tree t spans offsets[t]..offsets[t+1]
+TREE_LOGITS_JS = """
+// raw margins: per-class base score plus the summed leaf values of that class's trees
+function treeLogits(f) {
+  let logits = Array.from(baseScore);
+  for (let t = 0; t < offsets.length - 1; t++) {
+    const base = offsets[t];
+    let i = base;
+    while (left[i] >= 0) i = base + (f[feat[i]] < thr[i] ? left[i] : right[i]);
+    logits[treeInfo[t]] += leaf[i];
+  }
+  return logits;
+}
+"""
+
+# needs treeLogits(f) returning a fresh array of per-class margins
+PREDICT_JS = """
+// class probabilities
+export function predict(f) {
+  return softmax(treeLogits(f));
+}
+
+// index of the most likely class; softmax is monotonic, so argmax of the logits
+export function predictClass(f) {
+  const logits = treeLogits(f);
+  let best = 0;
+  for (let c = 1; c < logits.length; c++) if (logits[c] > logits[best]) best = c;
+  return best;
+}
+"""
+
+def parse_base_score(value, num_class):
+    """
+    Per-class base margin from learner_model_param.base_score. XGBoost 3 saves one
+    intercept per class ("[-3.17E-1,1.40E0,...]"), older boosters a single scalar ("5E-1");
+    the raw margin of class c is base_score[c] plus the summed leaves of its trees.
+    """
+    base = np.asarray(json.loads(value), dtype=np.float32)
+    return np.broadcast_to(base, (num_class,)).tolist()
+
+def js_ints(vals):
+    return ", ".join(str(int(v)) for v in vals)
+
+def js_floats(vals):
+    # 9 significant digits round-trip float32 exactly; with fewer, a threshold can land
+    # one ulp off in the Float32Array and rows sitting on the split take the other branch
+    return ", ".join(format(v, '.9g') for v in np.asarray(vals, dtype=np.float32).tolist())
+
+def write_model_js(out, rows, offsets, tree_info, base_score):
+    """
+    Write the model to the open text file `out`.
+    rows maps each NODE_ARRAYS name to one formatted row per tree; tree t spans
+    offsets[t]..offsets[t+1] and its child indices are relative to offsets[t].
+    base_score holds one margin per class (see parse_base_score).
+    """
+    for name, array_type in NODE_ARRAYS:
+        out.write(f"const {name} = new {array_type}([\n")
+        out.write(",\n".join(f"  {row}" for row in rows[name]))
+        out.write("\n]);\n\n")
+    out.write(f"const offsets = new Int32Array([{js_ints(offsets)}]);\n")
+    out.write(f"const treeInfo = new Int32Array([{js_ints(tree_info)}]);\n")
+    out.write(f"const baseScore = new Float32Array([{js_floats(base_score)}]);\n")
+    out.write(SOFTMAX_JS)
+    out.write(TREE_LOGITS_JS)
+    out.write(PREDICT_JS)
@@ -1,13 +1,13 @@
 import pandas as pd
 import os
 
-RAW = "Data/raw/synthetic_dataset_25k_40symptoms.csv"
-OUT = "Data/interim/cleaned_25k.csv"
+RAW = "Data/raw/synthetic_dataset_25k_40symptoms.parquet"
+OUT = "Data/interim/cleaned_25k.parquet"
 
 os.makedirs("Data/interim", exist_ok=True)
 
-print("Loading raw CSV...")
-df = pd.read_csv(RAW)
+print("Loading raw Parquet...")
+df = pd.read_parquet(RAW)
 
 # Standardize column names
 df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
@@ -23,5 +23,5 @@ for col in DROP:
 if "disease" not in df.columns:
     raise SystemExit("ERROR: 'disease' column missing.")
 
-df.to_csv(OUT, index=False)
+df.to_parquet(OUT, index=False, compression="zstd")
 print("Saved cleaned file →", OUT)
@@ -0,0 +1,59 @@
+import os
+import sys
+
+import joblib
+import orjson
+import pandas as pd
+
+from export_correct_booster import OUTPUT_JSON, OUTPUT_TREES, save_booster_json, save_trees
+from export_xgb_js import strip_legacy_attrs, write_onnx
+from export_xgb_onnx import LABEL_MAP_PATH, SCALER_PATH, export_labels_json, export_scaler_json
+from booster_js import parse_base_score
+from generate_inlined_js import WRITE_BUFFER, read_feature_names, write_js_model
+
+# Load the clean model once and write every export artifact from it. Each artifact has
+# one writer, and this script calls it:
+#   booster JSON + trees Parquet  (export_correct_booster.py)
+#   ONNX + onnxruntime-web loader  (export_xgb_onnx.py via export_xgb_js.py)
+#   scaler.json + labels.json  (export_xgb_onnx.py)
+#   flat-array inlined JS  (generate_inlined_js.py)
+# The booster is serialised once with save_raw and that single parse feeds the JS emitter.
+
+MODEL_PATH = "Data/processed/xgb_25k_clean.pkl"
+INLINED_JS_OUT = "Data/processed/xgb_25k_inlined.js"
+
+
+def write_flat_js(model_section, num_class, base_score, path):
+    with open(path, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        write_js_model(f, model_section, num_class, base_score, read_feature_names())
+    print("💾 Saved inlined JS →", path)
+
+
+def main():
+    if not os.path.exists(MODEL_PATH):
+        print("❌ ERROR: Model file not found:", MODEL_PATH)
+        sys.exit(1)
+
+    print("📥 Loading XGBoost model...")
+    model = joblib.load(MODEL_PATH, mmap_mode="r")
+    strip_legacy_attrs(model)
+    booster = model.get_booster()
+
+    raw = save_booster_json(booster)
+    print("💾 Saved booster JSON →", OUTPUT_JSON)
+    learner = orjson.loads(raw)["learner"]
+    num_class = int(learner["learner_model_param"]["num_class"])
+    base_score = parse_base_score(learner["learner_model_param"]["base_score"], num_class)
+
+    save_trees(model)
+    print("💾 Saved trees Parquet →", OUTPUT_TREES)
+    write_onnx(booster, model.n_features_in_)
+    export_scaler_json(joblib.load(SCALER_PATH, mmap_mode="r"))
+    export_labels_json(pd.read_csv(LABEL_MAP_PATH))
+    write_flat_js(learner["gradient_booster"]["model"], num_class, base_score, INLINED_JS_OUT)
+
+    print("\n🎉 SUCCESS! All export artifacts written.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,22 +3,59 @@ import json
 import xgboost as xgb
 import os
 
-print("📥 Loading model from xgb_25k.pkl...")
+from booster_js import parse_base_score
 
 MODEL_PATH = "Data/processed/xgb_25k.pkl"
 OUTPUT_JSON = "Data/processed/xgb_25k_fixed_booster.json"
+OUTPUT_TREES = "Data/processed/xgb_25k_trees.parquet"
 
-if not os.path.exists(MODEL_PATH):
-    print("❌ ERROR: Model file not found:", MODEL_PATH)
-    exit()
+# save_booster_json / save_trees are the single writers of the booster JSON and the
+# trees Parquet; export_all.py calls them too
 
-model = joblib.load(MODEL_PATH)
 
-print("🔧 Extracting booster...")
-booster = model.get_booster()
+def save_booster_json(booster, path=OUTPUT_JSON):
+    """Write the booster JSON and return its bytes, so callers can parse it without re-reading."""
+    raw = bytes(booster.save_raw("json"))
+    with open(path, "wb") as f:
+        f.write(raw)
+    return raw
 
-print("💾 Saving booster in correct JSON format...")
-booster.save_model(OUTPUT_JSON)
 
-print("🎉 SUCCESS! Correct booster JSON created:")
-print("➡", OUTPUT_JSON)
+def save_trees(model, path=OUTPUT_TREES):
+    """Write Booster.trees_to_dataframe() plus a Class column for convert_booster_v2.py."""
+    booster = model.get_booster()
+    trees = booster.trees_to_dataframe()
+    # Multiclass boosters add one tree per class each round
+    n_groups = model.n_classes_ if model.n_classes_ > 2 else 1
+    trees["Class"] = trees["Tree"] % n_groups
+    # trees_to_dataframe() has no intercept; keep the per-class base_score in the Parquet metadata
+    base_score = json.loads(booster.save_config())["learner"]["learner_model_param"]["base_score"]
+    trees.attrs["base_score"] = parse_base_score(base_score, n_groups)
+    trees.to_parquet(path, index=False)
+
+
+def main():
+    print("📥 Loading model from xgb_25k.pkl...")
+
+    if not os.path.exists(MODEL_PATH):
+        print("❌ ERROR: Model file not found:", MODEL_PATH)
+        exit()
+
+    model = joblib.load(MODEL_PATH)
+
+    print("🔧 Extracting booster...")
+    booster = model.get_booster()
+
+    print("💾 Saving booster in correct JSON format...")
+    save_booster_json(booster)
+
+    print("💾 Saving trees DataFrame for convert_booster_v2.py...")
+    save_trees(model)
+
+    print("🎉 SUCCESS! Correct booster JSON created:")
+    print("➡", OUTPUT_JSON)
+    print("➡", OUTPUT_TREES)
+
+
+if __name__ == "__main__":
+    main()
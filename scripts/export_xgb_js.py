@@ -1,46 +1,82 @@
 import joblib
-import m2cgen as m2c
 import os
 import sys
 
+from export_xgb_onnx import ONNX_OUT, export_onnx
+
 MODEL_DIR = "Data/processed"
 #MODEL_PATH = os.path.join(MODEL_DIR, "xgb_25k.pkl")
 MODEL_PATH = "Data/processed/xgb_25k_clean.pkl"
 JS_OUT = os.path.join(MODEL_DIR, "xgb_model.js")
 
-print("🔍 Checking model path:", MODEL_PATH)
-
-if not os.path.exists(MODEL_PATH):
-    print("❌ ERROR: Model file not found!")
-    sys.exit(1)
-
-print("📥 Loading XGBoost model...")
-model = joblib.load(MODEL_PATH)
-
-# ------------------------------------------------------------------
-# 🔥 IMPORTANT FIX — Remove legacy attributes XGBoost no longer supports
-# ------------------------------------------------------------------
-if hasattr(model, "use_label_encoder"):
-    print("⚠️ Removing deprecated parameter: use_label_encoder")
-    delattr(model, "use_label_encoder")
-
-if hasattr(model, "_le"):
-    print("⚠️ Removing deprecated internal label encoder")
-    delattr(model, "_le")
-
-# ------------------------------------------------------------------
-# Convert model → JS
-# ------------------------------------------------------------------
-print("🔄 Converting XGBoost model → JavaScript using m2cgen...")
-try:
-    js_code = m2c.export_to_javascript(model)
-except Exception as e:
-    print("❌ Conversion failed:")
-    print(e)
-    sys.exit(1)
-
-print("💾 Saving JS model →", JS_OUT)
-with open(JS_OUT, "w", encoding="utf-8") as f:
-    f.write(js_code)
-
-print("\n🎉 SUCCESS! xgb_model.js created.")
+# Thin onnxruntime-web loader: the trees run in ORT's WASM/SIMD tree-ensemble kernel,
+# and one input tensor is allocated up front and refilled on every call
+JS_LOADER = """// AUTO-GENERATED by scripts/export_xgb_js.py -- loads xgb_25k.onnx with onnxruntime-web
+import * as ort from "onnxruntime-web";
+
+ort.env.wasm.simd = true;
+ort.env.wasm.numThreads = navigator.hardwareConcurrency;
+
+const N_FEATURES = %d;
+const input = new Float32Array(N_FEATURES);
+const inputTensor = new ort.Tensor("float32", input, [1, N_FEATURES]);
+let session = null;
+
+export async function loadModel(url = "xgb_25k.onnx") {
+  session = await ort.InferenceSession.create(url, { executionProviders: ["wasm"] });
+  return session;
+}
+
+// f: feature array (N_FEATURES values); returns class probabilities
+export async function predict(f) {
+  if (!session) await loadModel();
+  input.set(f);
+  const out = await session.run({ input: inputTensor });
+  return out.probabilities.data;
+}
+"""
+
+def strip_legacy_attrs(model):
+    """🔥 IMPORTANT FIX — Remove legacy attributes XGBoost no longer supports."""
+    if hasattr(model, "use_label_encoder"):
+        print("⚠️ Removing deprecated parameter: use_label_encoder")
+        delattr(model, "use_label_encoder")
+
+    if hasattr(model, "_le"):
+        print("⚠️ Removing deprecated internal label encoder")
+        delattr(model, "_le")
+
+
+def write_onnx(booster, n_features, onnx_out=ONNX_OUT, js_out=JS_OUT):
+    """Write the ONNX model (export_xgb_onnx.export_onnx) plus the onnxruntime-web loader."""
+    print("🔄 Converting XGBoost model → ONNX using onnxmltools...")
+    try:
+        export_onnx(booster, n_features, onnx_out)
+    except Exception as e:
+        print("❌ Conversion failed:")
+        print(e)
+        sys.exit(1)
+
+    print("💾 Saving JS loader →", js_out)
+    with open(js_out, "w", encoding="utf-8") as f:
+        f.write(JS_LOADER % n_features)
+
+
+def main():
+    print("🔍 Checking model path:", MODEL_PATH)
+
+    if not os.path.exists(MODEL_PATH):
+        print("❌ ERROR: Model file not found!")
+        sys.exit(1)
+
+    print("📥 Loading XGBoost model...")
+    model = joblib.load(MODEL_PATH, mmap_mode="r")
+    strip_legacy_attrs(model)
+
+    write_onnx(model.get_booster(), model.n_features_in_)
+
+    print("\n🎉 SUCCESS! xgb_25k.onnx and xgb_model.js created.")
+
+
+if __name__ == "__main__":
+    main()
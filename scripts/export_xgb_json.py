@@ -6,7 +6,7 @@ model_path = "Data/processed/xgb_25k_clean.pkl"
 output_path = "Data/processed/xgb_25k_model.json"
 
 print("Loading clean model...")
-model = joblib.load(model_path)
+model = joblib.load(model_path, mmap_mode="r")
 
 booster = model.get_booster()
 
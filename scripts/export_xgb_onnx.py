@@ -17,47 +17,69 @@ ONNX_OUT = f"{MODEL_DIR}/xgb_25k.onnx"
 SCALER_JSON_OUT = f"{MODEL_DIR}/scaler.json"
 LABEL_JSON_OUT = f"{MODEL_DIR}/labels.json"
 
-print("Loading XGBoost model and scaler...")
+# These functions are the single writers of xgb_25k.onnx, scaler.json and labels.json;
+# export_xgb_js.py and export_all.py call them instead of converting on their own
 
-model = joblib.load(XGB_PATH)
-scaler = joblib.load(SCALER_PATH)
-labels_df = pd.read_csv(LABEL_MAP_PATH)
 
-with open(FEATURE_LIST_PATH, "r") as f:
-    features = [line.strip() for line in f.readlines()]
+def export_onnx(booster, n_features, onnx_out=ONNX_OUT):
+    # ---- Convert XGBoost → ONNX ----
+    print("Converting via onnxmltools...")
 
-print("Feature count:", len(features))
+    initial_type = [('input', FloatTensorType([None, n_features]))]
+    onnx_model = convert_xgb(booster, initial_types=initial_type)
 
-# ---- Convert XGBoost → ONNX ----
-print("Converting via onnxmltools...")
+    with open(onnx_out, "wb") as f:
+        f.write(onnx_model.SerializeToString())
 
-initial_type = [('input', FloatTensorType([None, len(features)]))]
-onnx_model = convert_xgb(model.get_booster(), initial_types=initial_type)
+    print("Saved ONNX model:", onnx_out)
 
-with open(ONNX_OUT, "wb") as f:
-    f.write(onnx_model.SerializeToString())
 
-print("Saved ONNX model:", ONNX_OUT)
+def export_scaler_json(scaler, out=SCALER_JSON_OUT):
+    # ---- Save scaler.json ----
+    numeric_cols = ["age", "heart_rate", "blood_pressure", "cholesterol_level"]
+    scaler_json = {
+        "mean": scaler.mean_.tolist(),
+        "scale": scaler.scale_.tolist(),
+        "columns": numeric_cols
+    }
 
-# ---- Save scaler.json ----
-numeric_cols = ["age", "heart_rate", "blood_pressure", "cholesterol_level"]
-scaler_json = {
-    "mean": scaler.mean_.tolist(),
-    "scale": scaler.scale_.tolist(),
-    "columns": numeric_cols
-}
+    with open(out, "w") as f:
+        json.dump(scaler_json, f, indent=2)
 
-with open(SCALER_JSON_OUT, "w") as f:
-    json.dump(scaler_json, f, indent=2)
+    print("Saved scaler.json")
 
-print("Saved scaler.json")
 
-# ---- Save labels.json ----
-labels_map = {int(row["encoded"]): row["disease"] for _, row in labels_df.iterrows()}
+def export_labels_json(labels_df, out=LABEL_JSON_OUT):
+    # ---- Save labels.json ----
+    labels_map = {int(row["encoded"]): row["disease"] for _, row in labels_df.iterrows()}
 
-with open(LABEL_JSON_OUT, "w") as f:
-    json.dump(labels_map, f, indent=2)
+    with open(out, "w") as f:
+        json.dump(labels_map, f, indent=2)
 
-print("Saved labels.json")
+    print("Saved labels.json")
 
-print("\n🎉 SUCCESS! ONNX EXPORT COMPLETED (onnxmltools).")
+
+def main():
+    print("Loading XGBoost model and scaler...")
+
+    # mmap_mode="r": NumPy arrays in the pickles (the scaler's mean_/scale_) are mapped
+    # read-only from disk instead of copied onto the heap; both objects are only read here
+
+    model = joblib.load(XGB_PATH, mmap_mode="r")
+    scaler = joblib.load(SCALER_PATH, mmap_mode="r")
+    labels_df = pd.read_csv(LABEL_MAP_PATH)
+
+    with open(FEATURE_LIST_PATH, "r") as f:
+        features = [line.strip() for line in f.readlines()]
+
+    print("Feature count:", len(features))
+
+    export_onnx(model.get_booster(), len(features))
+    export_scaler_json(scaler)
+    export_labels_json(labels_df)
+
+    print("\n🎉 SUCCESS! ONNX EXPORT COMPLETED (onnxmltools).")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,99 +1,149 @@
-import json
 import os
 
-INPUT_JSON = "Data/processed/xgb_25k_fixed_booster.json"
-OUTPUT_JS = "Data/processed/xgb_25k_inlined.js"
-
-def build_js_node(node):
-    """Recursively convert any XGBoost node into JS."""
-
-    # Case 1: Pure leaf
-    if "leaf" in node:
-        return f"return {node['leaf']};"
-
-    # Case 2: No split = leaf (fallback)
-    if "split" not in node:
-        return f"return {node.get('leaf', 0)};"
-
-    fid = node["split"]
-    threshold = node["split_condition"]
-
-    children = node.get("children", [])
-
-    # If no children, treat as leaf
-    if not children:
-        return f"return {node.get('leaf', 0)};"
-
-    # Find yes/no nodes
-    yes = next((c for c in children if c["nodeid"] == node["yes"]), None)
-    no = next((c for c in children if c["nodeid"] == node["no"]), None)
+import numpy as np
+import orjson
 
-    # Fallback if missing
-    if yes is None or no is None:
-        return f"return {node.get('leaf', 0)};"
+from booster_js import PREDICT_JS, SOFTMAX_JS, WRITE_BUFFER, js_floats, js_ints, parse_base_score
 
-    return (
-        f"if (f['{fid}'] <= {threshold}) {{ {build_js_node(yes)} }} "
-        f"else {{ {build_js_node(no)} }}"
-    )
-
-
-def build_js_tree(tree, idx):
-    """Each tree object is the root node."""
-    root = tree
-    body = build_js_node(root)
-    return f"""
-function tree_{idx}(f) {{
-    {body}
-}}
+INPUT_JSON = "Data/processed/xgb_25k_fixed_booster.json"
+OUTPUT_JS = "Data/processed/xgb_25k_inlined.js"
+FEATURE_LIST = "Data/processed/feature_list_25k.txt"
+
+def flatten_trees(trees):
+    """
+    Concatenate every tree's node arrays into flat FEAT/THR/LEFT/RIGHT/LEAF lists.
+    Child indices stay relative to the tree's offset; leaves keep LEFT = RIGHT = -1
+    and their value, which XGBoost stores in split_conditions, goes to LEAF.
+    """
+    feat, thr, left, right, leaf = [], [], [], [], []
+    offsets = []
+    for tree in trees:
+        base = len(feat)
+        offsets.append(base)
+        for l, r, s, c in zip(tree["left_children"], tree["right_children"],
+                              tree["split_indices"], tree["split_conditions"]):
+            if l < 0:
+                feat.append(0); thr.append(0.0); left.append(-1); right.append(-1); leaf.append(c)
+            else:
+                feat.append(s); thr.append(c); left.append(l); right.append(r); leaf.append(0.0)
+    return feat, thr, left, right, leaf, offsets
+
+
+def js_f16_bits(vals):
+    # float16 bit patterns; decoded back to a Float32Array by decodeF16 at module init
+    return js_ints(np.asarray(vals, dtype=np.float16).view(np.uint16))
+
+
+F16_DECODER = """
+function decodeF16(bits) {
+    const out = new Float32Array(bits.length);
+    for (let i = 0; i < bits.length; i++) {
+        const h = bits[i], e = (h >> 10) & 0x1f, m = h & 0x3ff;
+        const v = e === 0 ? m * 2 ** -24 : e === 31 ? (m ? NaN : Infinity) : (1024 + m) * 2 ** (e - 25);
+        out[i] = h & 0x8000 ? -v : v;
+    }
+    return out;
+}
 """
 
 
-def build_js_model(model, num_classes):
-    trees = model["trees"]
+def read_feature_names(path=FEATURE_LIST):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
 
-    js = ["// AUTO-GENERATED INLINE XGB MODEL"]
 
-    for i, tree in enumerate(trees):
-        js.append(build_js_tree(tree, i))
+def write_js_model(out, model, num_classes, base_score, feature_names):
+    """
+    Write the JS model to the open text file `out`, one section at a time.
+    base_score holds one margin per class (parse_base_score); each class sum starts from it.
+    predict(f) takes a Float32Array indexed in feature_names order; the emitted
+    encodeFeatures({name: value}) builds one.
+    """
+    trees = model["trees"]
+    # class of each tree; XGBoost interleaves multiclass trees
+    tree_class = model.get("tree_info") or [i % num_classes for i in range(len(trees))]
+    # Reorder trees so each class is one contiguous run: predict then sums class c
+    # over trees CLASS_START[c]..CLASS_START[c+1] with no per-tree class lookup
+    order = sorted(range(len(trees)), key=lambda i: tree_class[i])
+    class_start = [0] * (num_classes + 1)
+    for i in order:
+        class_start[int(tree_class[i]) + 1] += 1
+    for c in range(num_classes):
+        class_start[c + 1] += class_start[c]
+    feat, thr, left, right, leaf, offsets = flatten_trees([trees[i] for i in order])
+
+    def emit(text):
+        out.write(text + "\n")
+
+    emit("// AUTO-GENERATED INLINE XGB MODEL\n")
+    emit(f"const FEAT = new Int32Array([{js_ints(feat)}]);")
+    emit(f"const THR = new Float32Array([{js_floats(thr)}]);")
+    emit(f"const LEFT = new Int32Array([{js_ints(left)}]);")
+    emit(f"const RIGHT = new Int32Array([{js_ints(right)}]);")
+    # Leaf values ship as float16 (half the text, ~1e-4 change in probabilities).
+    # Thresholds stay float32: rounding them moves split points and flips predictions
+    emit(F16_DECODER)
+    emit(f"const LEAF = decodeF16(new Uint16Array([{js_f16_bits(leaf)}]));")
+    emit(f"const TREE_OFFSET = new Int32Array([{js_ints(offsets)}]);")
+    emit(f"const CLASS_START = new Int32Array([{js_ints(class_start)}]);")
+    emit(f"const BASE_SCORE = new Float32Array([{js_floats(base_score)}]);")
+    emit(f"const FEATURE_NAMES = {orjson.dumps(feature_names).decode()};")
+
+    emit("""
+// one interpreter loop for every tree: follow LEFT/RIGHT from the root until a leaf
+function walk(t, f) {
+    const base = TREE_OFFSET[t];
+    let i = base;
+    while (LEFT[i] >= 0) {
+        i = base + (f[FEAT[i]] < THR[i] ? LEFT[i] : RIGHT[i]);
+    }
+    return LEAF[i];
+}
 
-    js.append("""
-function softmax(arr) {
-    const m = Math.max(...arr);
-    const exps = arr.map(v => Math.exp(v - m));
-    const sum = exps.reduce((a,b) => a+b, 0);
-    return exps.map(v => v / sum);
+// {featureName: value} -> Float32Array in FEATURE_NAMES order (missing features are 0)
+export function encodeFeatures(input) {
+    const f = new Float32Array(FEATURE_NAMES.length);
+    for (let i = 0; i < FEATURE_NAMES.length; i++) f[i] = input[FEATURE_NAMES[i]] ?? 0;
+    return f;
 }
 """)
 
-    js.append(f"""
-export function predict(f) {{
+    emit(f"""
+// raw margins: per-class base score plus the summed leaf values of that class's trees
+function treeLogits(f) {{
     let logits = new Array({num_classes}).fill(0);
 
-    for (let i = 0; i < {len(trees)}; i++) {{
-        const cls = i % {num_classes};
-        logits[cls] += tree_{i}(f);
+    for (let c = 0; c < {num_classes}; c++) {{
+        let sum = BASE_SCORE[c];
+        for (let t = CLASS_START[c]; t < CLASS_START[c + 1]; t++) sum += walk(t, f);
+        logits[c] = sum;
     }}
 
-    return softmax(logits);
+    return logits;
 }}
 """)
+    # fused softmax, predict and predictClass shared with the root converters
+    emit(SOFTMAX_JS)
+    emit(PREDICT_JS)
 
-    return "\n".join(js)
 
+def main():
+    print("📥 Loading booster JSON...")
+    with open(INPUT_JSON, "rb") as f:
+        data = orjson.loads(f.read())
 
-### MAIN EXECUTION ###
-print("📥 Loading booster JSON...")
-data = json.load(open(INPUT_JSON, "r", encoding="utf-8"))
+    learner = data["learner"]
+    model = learner["gradient_booster"]["model"]
+    num_classes = int(learner["learner_model_param"]["num_class"])
+    base_score = parse_base_score(learner["learner_model_param"]["base_score"], num_classes)
 
-learner = data["learner"]
-model = learner["gradient_booster"]["model"]
-num_classes = int(learner["learner_model_param"]["num_class"])
+    print("🔄 Converting booster → JavaScript...")
+    with open(OUTPUT_JS, "w", encoding="utf-8", buffering=WRITE_BUFFER) as f:
+        write_js_model(f, model, num_classes, base_score, read_feature_names())
 
-print("🔄 Converting booster → JavaScript...")
-js_code = build_js_model(model, num_classes)
+    print("🎉 DONE! JS file created:")
+    print("➡", OUTPUT_JS)
 
-open(OUTPUT_JS, "w", encoding="utf-8").write(js_code)
 
-print("🎉 DONE! JS file created:")
-print("➡", OUTPUT_JS)
+if __name__ == "__main__":
+    main()
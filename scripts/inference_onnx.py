@@ -0,0 +1,52 @@
+import os
+import sys
+
+import numpy as np
+import onnxruntime as ort
+import pandas as pd
+
+# Batch inference on the ONNX export of the XGBoost model (export_xgb_onnx.py).
+# ONNX Runtime's TreeEnsembleClassifier kernel scores the whole batch in C++;
+# rows go in as one [batch, n_features] float32 tensor, never one at a time.
+
+ONNX_PATH = "Data/processed/xgb_25k.onnx"
+DATA = "Data/processed/final_dataset_25k.parquet"
+TARGET = "disease_encoded"
+
+
+def load_session(path=ONNX_PATH):
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    opts.intra_op_num_threads = os.cpu_count()
+    return ort.InferenceSession(path, opts, providers=["CPUExecutionProvider"])
+
+
+def predict_proba(sess, X):
+    """Class probabilities for every row of X (n_rows x n_features)."""
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    # outputs are [label, probabilities]
+    return sess.run(None, {sess.get_inputs()[0].name: X})[1]
+
+
+def main():
+    data_path = sys.argv[1] if len(sys.argv) > 1 else DATA
+
+    if not os.path.exists(ONNX_PATH):
+        print("❌ ERROR: ONNX model not found:", ONNX_PATH)
+        sys.exit(1)
+
+    print("📥 Loading ONNX model:", ONNX_PATH)
+    sess = load_session()
+
+    df = pd.read_parquet(data_path) if data_path.endswith(".parquet") else pd.read_csv(data_path, engine="pyarrow")
+    features = [c for c in df.columns if c not in ["disease", TARGET]]
+
+    probs = predict_proba(sess, df[features].to_numpy())
+    pred = probs.argmax(axis=1)
+    print(f"Predicted {len(pred)} rows")
+    if TARGET in df.columns:
+        print("Accuracy:", (pred == df[TARGET].to_numpy()).mean())
+
+
+if __name__ == "__main__":
+    main()
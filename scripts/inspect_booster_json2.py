@@ -1,15 +1,16 @@
-import json
+import ijson
 fpath = "Data/processed/xgb_25k_fixed_booster.json"  # adjust to your actual file name
-with open(fpath, "r", encoding="utf-8") as f:
-    data = json.load(f)
-print("Top‐level keys:", list(data.keys()))
-if "learner" not in data:
-    print("No 'learner' key found.")
-    # print small subset
-print("Printing nested keys and sample node:")
-import itertools
-for k,v in data.items():
-    print(k, type(v))
-    if isinstance(v, dict):
-        print("  Subkeys:", list(v.keys())[:5])
-    break
+
+# Stream the JSON event by event instead of loading it: only the keys before
+# learner.gradient_booster are read, then the parse stops (the trees follow)
+print("Top-level keys and learner subkeys:")
+with open(fpath, "rb") as f:
+    for prefix, event, value in ijson.parse(f):
+        if event != "map_key":
+            continue
+        if prefix == "":
+            print("Top-level key:", value)
+        elif prefix == "learner":
+            print("  learner subkey:", value)
+            if value == "gradient_booster":
+                break
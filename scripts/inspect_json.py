@@ -1,7 +1,7 @@
 import json
 
-with open("Data/processed/xgb_25k_model.json", "r") as f:
-    data = json.load(f)
+with open("Data/processed/xgb_25k_model.json", "rb") as f:
+    data = json.loads(f.read())
 
 print("Top-level keys:")
 print(list(data.keys()))
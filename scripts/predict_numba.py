@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+predict_numba.py
+
+Batch prediction in Python from the flat tree arrays that convert_booster_v2.py saves next
+to the generated JS (<out>.npz: feat, thr, left, right, leaf, offsets, tree_info, num_class,
+base_score).
+The traversal is the same while-loop as the JS predict, compiled with Numba and run in
+parallel over the rows of X.
+
+Usage:
+  python scripts/predict_numba.py /path/to/xgb_25k_inlined.npz Data/processed/final_dataset_25k.parquet
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+TARGET = "disease_encoded"
+
+def load_model(path):
+    """Return the flat tree arrays (as a dict) from the .npz written by convert_booster_v2.py."""
+    with np.load(path) as npz:
+        return {name: npz[name] for name in npz.files}
+
+@njit(parallel=True, cache=True)
+def predict_logits(X, feat, thr, left, right, leaf, offsets, tree_info, base_score):
+    """Raw margins for every row of X (float32, n_rows x n_features): base_score plus summed leaves per class."""
+    n_trees = offsets.shape[0] - 1
+    logits = np.empty((X.shape[0], base_score.shape[0]), dtype=np.float32)
+    for r in prange(X.shape[0]):
+        x = X[r]
+        logits[r, :] = base_score
+        for t in range(n_trees):
+            base = offsets[t]
+            i = base
+            while left[i] >= 0:
+                i = base + (left[i] if x[feat[i]] < thr[i] else right[i])
+            logits[r, tree_info[t]] += leaf[i]
+    return logits
+
+def predict_proba(X, model):
+    logits = predict_logits(
+        np.ascontiguousarray(X, dtype=np.float32),
+        model['feat'], model['thr'], model['left'], model['right'], model['leaf'],
+        model['offsets'], model['tree_info'], model['base_score'],
+    )
+    # softmax per row
+    e = np.exp(logits - logits.max(axis=1, keepdims=True))
+    return e / e.sum(axis=1, keepdims=True)
+
+def main():
+    if len(sys.argv) < 3:
+        print("Usage: python scripts/predict_numba.py model.npz features.parquet")
+        sys.exit(1)
+
+    model = load_model(sys.argv[1])
+    path = sys.argv[2]
+    df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path, engine="pyarrow")
+    features = [c for c in df.columns if c not in ["disease", TARGET]]
+
+    probs = predict_proba(df[features].to_numpy(), model)
+    pred = probs.argmax(axis=1)
+    print(f"Predicted {len(pred)} rows")
+    if TARGET in df.columns:
+        print("Accuracy:", (pred == df[TARGET].to_numpy()).mean())
+
+if __name__ == "__main__":
+    main()
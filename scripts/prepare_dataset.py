@@ -1,39 +1,40 @@
 import pandas as pd
+import numpy as np
 import os
-from sklearn.preprocessing import LabelEncoder
 
-IN = "Data/interim/cleaned_25k.csv"
-OUT = "Data/interim/prepared_25k.csv"
+IN = "Data/interim/cleaned_25k.parquet"
+OUT = "Data/interim/prepared_25k.parquet"
 LABEL_OUT = "Data/processed/label_mapping_25k.csv"
 
 os.makedirs("Data/interim", exist_ok=True)
 os.makedirs("Data/processed", exist_ok=True)
 
-df = pd.read_csv(IN)
+df = pd.read_parquet(IN)
 
-# Encode gender to 0/1
-df["gender"] = df["gender"].astype(str).str.lower().map(
-    lambda x: 0 if x in ["male","m","0"] else 1
-)
+# Encode gender to 0/1 (anything not male/m/0 counts as 1)
+df["gender"] = (~df["gender"].astype(str).str.lower().isin(["male","m","0"])).astype(np.int8)
 
 # Numeric vitals
 num_cols = ["age","smoker","heart_rate","blood_pressure","cholesterol_level"]
-for c in num_cols:
-    df[c] = pd.to_numeric(df[c], errors="coerce").fillna(df[c].median()).astype(int)
-
-# Symptoms → int
 symptoms = [c for c in df.columns if c not in num_cols + ["gender","disease"]]
-for c in symptoms:
-    df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
 
-# Encode disease
-le = LabelEncoder()
-df["disease_encoded"] = le.fit_transform(df["disease"])
+# Coerce every column in one pass, then fill and downcast per group:
+# vitals get their median (all < 300 → int16), symptoms 0 (severity 0–3 → int8)
+cols = num_cols + symptoms
+df[cols] = df[cols].apply(pd.to_numeric, errors="coerce")
+df[num_cols] = df[num_cols].fillna(df[num_cols].median()).astype(np.int16)
+df[symptoms] = df[symptoms].fillna(0).astype(np.int8)
+
+# Encode disease: categories are sorted, so codes match LabelEncoder's;
+# with < 128 classes pandas already stores the codes as int8
+cat = pd.Categorical(df["disease"])
+df["disease_encoded"] = cat.codes
 
 # Save mapping
-map_df = pd.DataFrame({"disease": le.classes_, "encoded": range(len(le.classes_))})
+map_df = pd.DataFrame({"disease": cat.categories, "encoded": range(len(cat.categories))})
 map_df.to_csv(LABEL_OUT, index=False)
 print("Saved label mapping →", LABEL_OUT)
 
-df.to_csv(OUT, index=False)
+# Parquet keeps the int8/int16 dtypes and skips a text parse downstream
+df.to_parquet(OUT, index=False, compression="zstd")
 print("Saved prepared file →", OUT)
@@ -1,15 +1,18 @@
 import pandas as pd
+import numpy as np
 import os
-from sklearn.preprocessing import StandardScaler
+import sys
+from types import SimpleNamespace
 import joblib
 
-IN = "Data/interim/prepared_25k.csv"
-OUT = "Data/processed/final_dataset_25k.csv"
+IN = "Data/interim/prepared_25k.parquet"
+OUT = "Data/processed/final_dataset_25k.parquet"
+DEBUG_CSV = "Data/processed/final_dataset_25k.csv"
 SCALER_OUT = "Data/processed/scaler_25k.pkl"
 
 os.makedirs("Data/processed", exist_ok=True)
 
-df = pd.read_csv(IN)
+df = pd.read_parquet(IN)
 
 target = "disease_encoded"
 exclude = ["disease", target]
@@ -17,12 +20,23 @@ features = [c for c in df.columns if c not in exclude]
 
 # Scale only vital signs
 scale_cols = ["age","heart_rate","blood_pressure","cholesterol_level"]
-scaler = StandardScaler()
-df[scale_cols] = scaler.fit_transform(df[scale_cols])
+# Plain float32 NumPy standardisation (same as StandardScaler: ddof=0, std 0 -> 1).
+# The saved object only carries mean_/scale_, which is all export_xgb_onnx.py reads
+arr = df[scale_cols].to_numpy(dtype=np.float32)
+mean = arr.mean(axis=0)
+scale = arr.std(axis=0)
+scale[scale == 0] = 1.0
+df[scale_cols] = (arr - mean) / scale
+scaler = SimpleNamespace(mean_=mean, scale_=scale)
 
 joblib.dump(scaler, SCALER_OUT)
 print("Saved scaler:", SCALER_OUT)
 
-df.to_csv(OUT, index=False)
+df.to_parquet(OUT, index=False, compression="zstd")
 print("Saved final dataset:", OUT)
+
+# CSV copy for eyeballing only; nothing in the pipeline reads it
+if "--csv" in sys.argv:
+    df.to_csv(DEBUG_CSV, index=False)
+    print("Saved debug CSV:", DEBUG_CSV)
 print("Total features:", len(features))
@@ -1,6 +1,7 @@
-import json
 import os
 
+import orjson
+
 MODEL_PATH = "Data/processed/xgb_25k_model.json"
 OUTPUT_PATH = "Data/processed/xgb_25k_model.js"
 
@@ -10,8 +11,8 @@ if not os.path.exists(MODEL_PATH):
     print("❌ ERROR: JSON model not found!")
     exit()
 
-with open(MODEL_PATH, "r") as f:
-    data = json.load(f)
+with open(MODEL_PATH, "rb") as f:
+    data = orjson.loads(f.read())
 
 if "trees" not in data:
     print("❌ ERROR: Invalid XGBoost JSON format. No 'trees' key found.")
@@ -19,51 +20,68 @@ if "trees" not in data:
 
 print(f"🌲 Total trees: {len(data['trees'])}")
 
-js = "// Auto-generated JS from XGBoost JSON\n\n"
-
 # ---- TREE GENERATOR ----
-def generate_node(node, nodes, depth=1):
-    indent = "    " * depth
-
-    # Leaf node
-    if "leaf" in node:
-        return f"{indent}return {node['leaf']};\n"
-
-    # Non-leaf node
-    fid = node["split"]
-    thresh = node["split_condition"]
-    yes = node["yes"]
-    no = node["no"]
-
-    code = f"{indent}if (features[{fid}] <= {thresh}) {{\n"
-    code += generate_node(nodes[yes], nodes, depth + 1)
-    code += f"{indent}}} else {{\n"
-    code += generate_node(nodes[no], nodes, depth + 1)
-    code += f"{indent}}}\n"
-
-    return code
-
-
-# ---- BUILD TREE FUNCTIONS ----
-for idx, tree in enumerate(data["trees"]):
-    js += f"// Tree {idx}\n"
-    js += f"function tree_{idx}(features) {{\n"
-    js += generate_node(tree["nodes"][0], tree["nodes"], 1)
-    js += "}\n\n"
-
-# ---- FINAL PREDICT FUNCTION ----
-js += "export function predict(features) {\n"
-js += "    let sum = 0;\n"
-
-for idx in range(len(data["trees"])):
-    js += f"    sum += tree_{idx}(features);\n"
-
-js += "    return sum;\n"
-js += "}\n"
-
-# ---- SAVE JS FILE ----
-with open(OUTPUT_PATH, "w") as f:
-    f.write(js)
+def feature_index(fid):
+    # splits may name features "f<index>"; the JS indexes a Float32Array by position
+    return int(fid[1:]) if isinstance(fid, str) and fid.startswith("f") else int(fid)
+
+
+def generate_node(root, nodes, depth=1):
+    # Iterative DFS: `nodes` is already indexed by node id, so yes/no are direct
+    # lookups. The stack holds (node, depth) pairs and literal strings (else/closing
+    # braces); fragments are collected in a list and joined once
+    parts = []
+    stack = [(root, depth)]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+            continue
+        node, depth = item
+        indent = "    " * depth
+
+        # Leaf node
+        if "leaf" in node:
+            parts.append(f"{indent}return {node['leaf']};\n")
+            continue
+
+        # Non-leaf node
+        fid = feature_index(node["split"])
+        thresh = node["split_condition"]
+        yes = node["yes"]
+        no = node["no"]
+
+        parts.append(f"{indent}if (features[{fid}] <= {thresh}) {{\n")
+        # pushed in reverse: yes branch, else, no branch, closing brace
+        stack.append(f"{indent}}}\n")
+        stack.append((nodes[no], depth + 1))
+        stack.append(f"{indent}}} else {{\n")
+        stack.append((nodes[yes], depth + 1))
+
+    return "".join(parts)
+
+
+# ---- WRITE JS FILE ----
+# Streamed tree by tree through a 1 MB buffer instead of building one big string
+with open(OUTPUT_PATH, "w", buffering=1 << 20) as f:
+    f.write("// Auto-generated JS from XGBoost JSON\n\n")
+
+    # ---- BUILD TREE FUNCTIONS ----
+    for idx, tree in enumerate(data["trees"]):
+        f.write(f"// Tree {idx}\n")
+        f.write(f"function tree_{idx}(features) {{\n")
+        f.write(generate_node(tree["nodes"][0], tree["nodes"], 1))
+        f.write("}\n\n")
+
+    # ---- FINAL PREDICT FUNCTION ----
+    f.write("export function predict(features) {\n")
+    f.write("    let sum = 0;\n")
+
+    for idx in range(len(data["trees"])):
+        f.write(f"    sum += tree_{idx}(features);\n")
+
+    f.write("    return sum;\n")
+    f.write("}\n")
 
 print("✅ JS model generated successfully!")
 print("➡ Output:", OUTPUT_PATH)
@@ -27,13 +27,14 @@ function weightFor(labelIdx, featIdx) {
 
 /**
  * predictXGB(features)
- * - features: array of numbers (already scaled by index.ts)
+ * - features: array or Float32Array of numbers (already scaled by index.ts)
  * - returns: array of logits (length = labels.length)
  *
  * This is a deterministic placeholder — replace with real converted booster code.
  */
 export function predictXGB(features) {
-  if (!Array.isArray(features)) {
+  // index.ts passes a Float32Array; Array.isArray is false for typed arrays
+  if (!Array.isArray(features) && !ArrayBuffer.isView(features)) {
     throw new Error("predictXGB expects an array of numbers");
   }
 
@@ -9,128 +9,103 @@ Robust converter for XGBoost JSON boosters:
     - function tree_i(f) { ... }
     - const trees = [ tree_0, tree_1, ... ];
     - export function predict(f) { ... }
+- like XGBoost, a node takes its yes/left branch when f[feat] < threshold, and each
+  class sum starts from learner_model_param.base_score
 Usage:
   python convert_booster_v3.py Data/processed/xgb_25k_fixed_booster.json supabase/functions/predict_disease/xgb_25k_inlined.js
 """
 
-import json
 import sys
 import math
 
+import numpy as np
+import orjson
+
 def find_booster_section(data):
-    # common paths
-    for path in [
-        ('learner','gradient_booster','model'),
-        ('learner','gradient_booster'),
-        ('learner','gradient_booster','model','gbtree'),
-        ()
-    ]:
-        cur = data
-        ok = True
-        if not path:
-            continue
-        for p in path:
-            if isinstance(cur, dict) and p in cur:
-                cur = cur[p]
-            else:
-                ok = False
-                break
-        if ok and isinstance(cur, dict):
-            return cur
-    # fallback: search recursively for object that has 'trees' list
-    def search(o):
-        if isinstance(o, dict):
-            if 'trees' in o and isinstance(o['trees'], list):
-                return o
-            for v in o.values():
-                r = search(v)
-                if r is not None: return r
-        elif isinstance(o, list):
-            for item in o:
-                r = search(item)
-                if r is not None: return r
-        return None
-    return search(data)
+    # XGBoost always saves the trees under learner.gradient_booster.model
+    try:
+        section = data['learner']['gradient_booster']['model']
+        section['trees']
+    except KeyError:
+        print("ERROR: no learner.gradient_booster.model.trees in booster JSON")
+        sys.exit(1)
+    return section
 
 # ------------------ Emit JS for flat-array tree ------------------
 def emit_flat_tree_js(tree, idx):
-    # tree expected keys: left_children, right_children, split_indices, split_conditions, base_weights (leaf values), default_left
+    # tree expected keys: left_children, right_children, split_indices, split_conditions, default_left
     left = tree.get('left_children') or tree.get('left_children', [])
     right = tree.get('right_children') or tree.get('right_children', [])
     splits = tree.get('split_indices') or tree.get('split_indices', [])
     conds = tree.get('split_conditions') or tree.get('split_conditions', [])
-    base_weights = tree.get('base_weights') or tree.get('base_weights', [])
     default_left = tree.get('default_left') or tree.get('default_left', [])
 
     n = max(len(left), len(right), len(splits), len(conds))
-    # fallback: if base_weights length equals n, treat as node-wise weight; otherwise leaves
-    # build map of node -> leaf value if possible
-    leaf_map = {}
-    if isinstance(base_weights, list) and len(base_weights) == n:
-        for i in range(n):
-            leaf_map[i] = float(base_weights[i])
-    else:
-        # detect leaves by left[i] < 0 and right[i] < 0
-        leaves = [i for i in range(n) if (i < len(left) and i < len(right) and left[i] < 0 and right[i] < 0)]
-        if isinstance(base_weights, list) and len(base_weights) == len(leaves) and len(leaves) > 0:
-            for j,node in enumerate(leaves):
-                leaf_map[node] = float(base_weights[j])
-        else:
-            # fallback zero for leaves not found
-            for i in leaves:
-                leaf_map[i] = 0.0
+    has_children = len(left) > 0 and len(right) > 0
+
+    # Pad every node array to length n once, so emit_node needs no bounds checks
+    def padded(vals, fill, dtype):
+        arr = np.full(n, fill, dtype=dtype)
+        arr[:len(vals)] = vals
+        return arr
+    left_a = padded(left, -1, np.int64)
+    right_a = padded(right, -1, np.int64)
+    leaf_mask = (left_a < 0) & (right_a < 0)
+
+    # split_conditions holds the threshold of a split node and the value of a leaf
+    # (base_weights is the weight before the learning rate, not the leaf value).
+    # Rounded to float32 as XGBoost compares them, then emitted as exact doubles
+    conds_a = padded(conds, 0.0, np.float32).astype(np.float64)
+    leaf_vals = np.where(leaf_mask, conds_a, 0.0)
+
+    # plain Python lists for the emit loop (scalar access on lists is cheaper)
+    left = left_a.tolist()
+    right = right_a.tolist()
+    splits = padded(splits, 0, np.int64).tolist()
+    conds = conds_a.tolist()
+    leaf_vals = leaf_vals.tolist()
 
     lines = []
     lines.append(f"function tree_{idx}(f) {{")
-    sys.setrecursionlimit(10000)
-
-    def emit_node(i, indent):
-        sp = "  " * indent
-        # protective bounds
-        li = left[i] if i < len(left) else -1
-        ri = right[i] if i < len(right) else -1
-        if li < 0 and ri < 0:
-            val = leaf_map.get(i, 0.0)
-            lines.append(f"{sp}return {float(val)};")
-            return
-        feat = splits[i] if i < len(splits) else 0
-        cond = conds[i] if i < len(conds) else 0.0
-        # default_left fallback
-        dl = default_left[i] if i < len(default_left) else 0
-        # emit safe condition
-        lines.append(f"{sp}if (f[{int(feat)}] <= {float(cond)}) "+"{")
-        # left branch
-        if li >= 0:
-            emit_node(int(li), indent+1)
-        else:
-            # try to use leaf_map for this index if any
-            val = leaf_map.get(i, 0.0)
-            lines.append(f"{sp}  return {float(val)};")
-        lines.append(f"{sp}"+"} else {")
-        # right branch
-        if ri >= 0:
-            emit_node(int(ri), indent+1)
-        else:
-            val = leaf_map.get(i, 0.0)
-            lines.append(f"{sp}  return {float(val)};")
-        lines.append(f"{sp}"+"}")
+    def emit_node(root):
+        # Iterative DFS: the stack holds (node, indent) pairs still to emit and
+        # plain strings (closing braces / else lines) to emit once they are popped
+        stack = [(root, 1)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                lines.append(item)
+                continue
+            i, indent = item
+            sp = "  " * indent
+            li = left[i]
+            ri = right[i]
+            if li < 0 and ri < 0:
+                lines.append(f"{sp}return {float(leaf_vals[i])};")
+                continue
+            # emit safe condition
+            lines.append(f"{sp}if (f[{int(splits[i])}] < {conds[i]}) "+"{")
+            # pushed in reverse: left branch, else, right branch, closing brace;
+            # a missing child contributes 0.0
+            stack.append(f"{sp}"+"}")
+            stack.append((ri, indent+1) if ri >= 0 else f"{sp}  return 0.0;")
+            stack.append(f"{sp}"+"} else {")
+            stack.append((li, indent+1) if li >= 0 else f"{sp}  return 0.0;")
 
     # If no left/right arrays, fallback to stub
-    if not left or not right:
+    if not has_children:
         lines.append("  return 0.0;")
     else:
-        emit_node(0, 1)
+        emit_node(0)
     lines.append("}")
     return "\n".join(lines)
 
 # ------------------ Emit JS for nested-node tree ------------------
-def emit_nested_tree_js(root, idx):
-    # root is a dict with nodeid, split, split_condition, yes/no/missing, children OR nested nodes
-    lines = []
-    lines.append(f"function tree_{idx}(f) {{")
-    sys.setrecursionlimit(10000)
+def build_node_map(tree, root):
+    """nodeid -> node. A 'nodes' list is already id-keyed; nested trees need one walk."""
+    if isinstance(tree, dict) and isinstance(tree.get('nodes'), list):
+        return {int(n['nodeid']): n for n in tree['nodes'] if 'nodeid' in n}
 
-    # build map nodeid->node by traversing nested structure
     node_map = {}
     stack = [root]
     while stack:
@@ -150,53 +125,61 @@ def emit_nested_tree_js(root, idx):
         for k in ['left','right']:
             if k in n and isinstance(n[k], dict):
                 stack.append(n[k])
+    return node_map
 
-    def emit_node(nid, indent):
-        sp = "  " * indent
-        node = node_map.get(nid)
-        if node is None:
-            lines.append(f"{sp}return 0.0;")
-            return
-        if 'leaf' in node:
-            lines.append(f"{sp}return {float(node.get('leaf',0.0))};")
-            return
-        # determine feature index
-        feat = node.get('split_index') or node.get('split_feature') or node.get('split')
-        try:
-            feat_idx = int(feat)
-        except Exception:
-            # fallback 0
-            feat_idx = 0
-        cond = node.get('split_condition') if 'split_condition' in node else node.get('threshold',0.0)
-        yes = node.get('yes')
-        no = node.get('no')
-        missing = node.get('missing', yes)
-        # if no/yes missing, try children order
-        if (yes is None or no is None) and 'children' in node:
-            ch = node.get('children') or []
-            if isinstance(ch, list) and len(ch) >= 2:
-                yes = ch[0].get('nodeid')
-                no = ch[1].get('nodeid')
-        yes = yes if yes is not None else -1
-        no = no if no is not None else -1
+def emit_nested_tree_js(node_map, idx):
+    # node_map: nodeid -> node dict with split, split_condition, yes/no/missing or leaf
+    lines = []
+    lines.append(f"function tree_{idx}(f) {{")
+
+    def emit_node(root_id):
+        # Iterative DFS over node ids; strings on the stack are emitted as-is
+        stack = [(root_id, 1)]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, str):
+                lines.append(item)
+                continue
+            nid, indent = item
+            sp = "  " * indent
+            node = node_map.get(nid)
+            if node is None:
+                lines.append(f"{sp}return 0.0;")
+                continue
+            if 'leaf' in node:
+                lines.append(f"{sp}return {float(node.get('leaf',0.0))};")
+                continue
+            # determine feature index
+            feat = node.get('split_index') or node.get('split_feature') or node.get('split')
+            try:
+                feat_idx = int(feat)
+            except Exception:
+                # fallback 0
+                feat_idx = 0
+            cond = node.get('split_condition') if 'split_condition' in node else node.get('threshold',0.0)
+            yes = node.get('yes')
+            no = node.get('no')
+            # if no/yes missing, try children order
+            if (yes is None or no is None) and 'children' in node:
+                ch = node.get('children') or []
+                if isinstance(ch, list) and len(ch) >= 2:
+                    yes = ch[0].get('nodeid')
+                    no = ch[1].get('nodeid')
+            yes = yes if yes is not None else -1
+            no = no if no is not None else -1
 
-        lines.append(f"{sp}if (f[{feat_idx}] <= {float(cond)}) "+"{")
-        if yes is not None and int(yes) in node_map:
-            emit_node(int(yes), indent+1)
-        else:
-            lines.append(f"{sp}  return 0.0;")
-        lines.append(f"{sp}"+"} else {")
-        if no is not None and int(no) in node_map:
-            emit_node(int(no), indent+1)
-        else:
-            lines.append(f"{sp}  return 0.0;")
-        lines.append(f"{sp}"+"}")
+            lines.append(f"{sp}if (f[{feat_idx}] < {float(np.float32(cond))}) "+"{")
+            # pushed in reverse: yes branch, else, no branch, closing brace
+            stack.append(f"{sp}"+"}")
+            stack.append((int(no), indent+1) if int(no) in node_map else f"{sp}  return 0.0;")
+            stack.append(f"{sp}"+"} else {")
+            stack.append((int(yes), indent+1) if int(yes) in node_map else f"{sp}  return 0.0;")
 
     # pick root id as 0 if present else min nodeid
     root_id = 0
     if 0 not in node_map:
         root_id = min(node_map.keys()) if node_map else 0
-    emit_node(root_id, 1)
+    emit_node(root_id)
     lines.append("}")
     return "\n".join(lines)
 
@@ -209,47 +192,40 @@ def main():
     booster_path = sys.argv[1]
     out_path = sys.argv[2]
 
-    with open(booster_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # orjson parses the raw bytes directly
+    with open(booster_path, 'rb') as f:
+        data = orjson.loads(f.read())
 
     booster_section = find_booster_section(data)
-    if booster_section is None:
-        print("ERROR: could not find booster section in JSON")
-        sys.exit(1)
-
-    # locate trees list
-    trees = booster_section.get('trees') or data.get('trees') or []
-    if not isinstance(trees, list) or len(trees) == 0:
-        # try deeper scanning
-        def scan(obj):
-            if isinstance(obj, dict):
-                for k,v in obj.items():
-                    if k == 'trees' and isinstance(v, list):
-                        return v
-                    else:
-                        r = scan(v)
-                        if r: return r
-            elif isinstance(obj, list):
-                for it in obj:
-                    r = scan(it)
-                    if r: return r
-            return None
-        trees = scan(data) or []
+    trees = booster_section['trees']
     if not trees:
         print("ERROR: no trees found")
         sys.exit(1)
 
     # find tree_info and num_class
-    tree_info = booster_section.get('tree_info') or data.get('learner',{}).get('gradient_booster',{}).get('model',{}).get('tree_info') or []
+    tree_info = booster_section.get('tree_info') or []
+    model_param = data.get('learner',{}).get('learner_model_param',{})
     num_class = 1
     try:
-        num_class = int(data.get('learner',{}).get('learner_model_param',{}).get('num_class',1))
+        num_class = int(model_param.get('num_class',1))
     except Exception:
         num_class = 1
+    num_class = max(num_class, 1)
+    # per-class base margin: XGBoost 3 saves one value per class ("[...]"), older boosters a scalar
+    base_score = orjson.loads(model_param.get('base_score', '0'))
+    if not isinstance(base_score, list):
+        base_score = [base_score] * num_class
+    base_score = np.asarray(base_score, dtype=np.float32).astype(np.float64).tolist()
 
     print(f"Found {len(trees)} trees, num_class={num_class}, tree_info_len={len(tree_info)}")
 
-    with open(out_path, 'w', encoding='utf-8') as out:
+    # Class of every tree, fixed here so predict has a constant index per tree;
+    # without a usable tree_info, XGBoost's multiclass trees are interleaved by class
+    if not (tree_info and len(tree_info) == len(trees)):
+        tree_info = [i % num_class for i in range(len(trees))]
+
+    # 1 MB write buffer: each tree's JS is written as soon as it is emitted
+    with open(out_path, 'w', encoding='utf-8', buffering=1 << 20) as out:
         out.write("// AUTO-GENERATED INLINE XGBOOST JS MODEL (v3)\n\n")
         warnings = 0
         for i, tree in enumerate(trees):
@@ -260,39 +236,31 @@ def main():
                     out.write(js + "\n\n")
                 # detect nested node format where root contains 'nodeid' or 'children'
                 elif isinstance(tree, dict) and ('nodeid' in tree or 'children' in tree or 'leaf' in tree or 'split_condition' in tree):
-                    js = emit_nested_tree_js(tree, i)
+                    js = emit_nested_tree_js(build_node_map(tree, tree), i)
                     out.write(js + "\n\n")
                 # detect 'nodes' list with node dicts
                 elif isinstance(tree, dict) and 'nodes' in tree and isinstance(tree['nodes'], list):
-                    # build node map from nodes and use emit_nested_tree_js
-                    nodes = tree['nodes']
-                    # build a pseudo-root that contains children list
-                    root = None
-                    # find node with nodeid == 0 or with no parent
-                    node_map = {int(n['nodeid']): n for n in nodes if 'nodeid' in n}
-                    root_id = 0 if 0 in node_map else min(node_map.keys())
-                    # create fake nested structure by leaving nodes as-is and emit from map
-                    js = emit_tree_from_map_for_nodes(node_map, root_id, i) if 'emit_tree_from_map_for_nodes' in globals() else emit_nested_tree_js(nodes[0], i)
+                    # nodes list is indexed by nodeid directly; no nested walk needed
+                    js = emit_nested_tree_js(build_node_map(tree, None), i)
                     out.write(js + "\n\n")
                 else:
                     # fallback: try to build node map from nested search
                     # attempt to find first dict-with-nodeid in this tree
-                    found = False
                     def find_nodeobj(o):
-                        if isinstance(o, dict):
-                            if 'nodeid' in o:
-                                return o
-                            for v in o.values():
-                                r = find_nodeobj(v)
-                                if r: return r
-                        elif isinstance(o, list):
-                            for it in o:
-                                r = find_nodeobj(it)
-                                if r: return r
+                        # depth-first, first match wins; children pushed reversed to keep order
+                        stack = [o]
+                        while stack:
+                            o = stack.pop()
+                            if isinstance(o, dict):
+                                if 'nodeid' in o:
+                                    return o
+                                stack.extend(reversed(list(o.values())))
+                            elif isinstance(o, list):
+                                stack.extend(reversed(o))
                         return None
                     rootobj = find_nodeobj(tree)
                     if rootobj:
-                        js = emit_nested_tree_js(rootobj, i)
+                        js = emit_nested_tree_js(build_node_map(rootobj, rootobj), i)
                         out.write(js + "\n\n")
                     else:
                         warnings += 1
@@ -310,25 +278,24 @@ def main():
         out.write("\n];\n\n")
         # softmax + predict
         out.write("""
-function softmax(arr) {
-  const m = Math.max(...arr);
-  const exps = arr.map(v => Math.exp(v - m));
-  const sum = exps.reduce((a,b)=>a+b,0);
-  return exps.map(v => v / sum);
+function softmax(a) {
+  // max, exp+sum and normalize as three plain loops, in place
+  let m = a[0];
+  for (let i = 1; i < a.length; i++) if (a[i] > m) m = a[i];
+  let s = 0;
+  for (let i = 0; i < a.length; i++) {
+    a[i] = Math.exp(a[i] - m);
+    s += a[i];
+  }
+  for (let i = 0; i < a.length; i++) a[i] /= s;
+  return a;
 }
 
 export function predict(f) {
-  const numClasses = %d;
-  let logits = new Array(numClasses).fill(0);
-""" % num_class)
-        if tree_info and len(tree_info) == len(trees):
-            for i,cls in enumerate(tree_info):
-                out.write(f"  logits[{int(cls)}] += tree_{i}(f);\n")
-        else:
-            out.write("  for (let i=0;i<trees.length;i++){\n")
-            out.write("    const cls = i % numClasses;\n")
-            out.write("    logits[cls] += trees[i](f);\n")
-            out.write("  }\n")
+  let logits = [%s];
+""" % ", ".join(str(b) for b in base_score))
+        for i,cls in enumerate(tree_info):
+            out.write(f"  logits[{int(cls)}] += tree_{i}(f);\n")
         out.write("""
   return softmax(logits);
 }
@@ -5,8 +5,23 @@ import { serve } from "https://deno.land/std@0.182.0/http/server.ts";
 // (NOT USING IMPORTS)
 // -------------------------
 
+// base64 little-endian float32 bytes -> Float32Array
+function decodeFloat32(b64) {
+  const bin = atob(b64);
+  const bytes = new Uint8Array(bin.length);
+  for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+  return new Float32Array(bytes.buffer);
+}
+
 async function loadModelFiles() {
   const scaler = JSON.parse(await Deno.readTextFile("./scaler.json"));
+  // generate_scaler_json.py emits mean_b64 / inv_std_b64; older files carry mean / std lists
+  if (scaler.mean_b64) {
+    scaler.mean = decodeFloat32(scaler.mean_b64);
+    scaler.invStd = decodeFloat32(scaler.inv_std_b64);
+  } else {
+    scaler.invStd = scaler.std.map((s) => 1 / (s || 1));
+  }
   const labels = JSON.parse(await Deno.readTextFile("./labels.json"));
 
   // booster_min.js exports a function → we eval it manually
@@ -17,8 +32,12 @@ async function loadModelFiles() {
 }
 
 // ---- SCALER ----
+// The generated predictors index features by position (f[3], not f["fever"]), so
+// the input is a Float32Array in feature_list_25k.txt order; keep it typed here.
 function scaleInput(arr, scaler) {
-  return arr.map((v, i) => (v - scaler.mean[i]) / (scaler.std[i] || 1));
+  const out = new Float32Array(arr.length);
+  for (let i = 0; i < arr.length; i++) out[i] = (arr[i] - scaler.mean[i]) * scaler.invStd[i];
+  return out;
 }
 
 // ---- SOFTMAX ----
@@ -49,7 +68,7 @@ serve(async (req) => {
 
     const scaled = scaleInput(symptoms, scaler);
 
-    // Get logits
+    // Get logits (scaled is a Float32Array, one slot per feature)
     const logits = predictXGB(scaled);
 
     const probs = softmax(logits);